@@ -2,12 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import json
+import os
 import re
 import sys
-from collections import defaultdict
 from datetime import datetime
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 # ==========================
 # CONFIG (novo padrão)
@@ -16,6 +17,9 @@ from typing import Any, Dict, List, Optional, Tuple
 BASE_DIR = Path(__file__).parent
 ASSETS_FILE = BASE_DIR / "assets.json"
 
+# chave privada (não persistida) com o nascimento já parseado
+DOB_KEY = "_dob_ymd"
+
 
 # ==========================
 # CONSTANTES
@@ -37,28 +41,84 @@ MESES_PT = {
 }
 
 
+# ==========================
+# TIPOS
+# ==========================
+
+
+class Birthday(NamedTuple):
+    """Linha de listagem: um ativo que faz aniversário."""
+
+    nome: str
+    sobrenome: str
+    ano: int
+    mes: int
+    dia: int
+    idade: int
+
+    @property
+    def nascimento(self) -> str:
+        # dd/mm/aaaa direto dos ints (sem datetime/strftime)
+        return f"{self.dia:02d}/{self.mes:02d}/{self.ano:04d}"
+
+
 # ==========================
 # JSON tolerant loader
 # ==========================
 
 _COMMENT_RE = re.compile(r"(^|\s)//.*?$|(^|\s)#.*?$", re.MULTILINE)
-_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+# comentários OU vírgula final (inclusive com comentários antes do fechamento),
+# tudo numa única varredura do texto
+_SANITIZE_RE = re.compile(
+    r"(?P<c>(^|\s)//.*?$|(^|\s)#.*?$)"
+    r"|,(?P<t>(?:(?:^|\s)(?://|#).*?$|\s)*[}\]])",
+    re.MULTILINE,
+)
+
+
+def _sanitize_repl(m: "re.Match[str]") -> str:
+    tail = m.group("t")
+    if tail is None:
+        return ""
+    # vírgula final: descarta a vírgula e eventuais comentários até o fechamento
+    return _COMMENT_RE.sub("", tail)
 
 
 def sanitize_json(text: str) -> str:
-    text = re.sub(_COMMENT_RE, "", text)
-    text = re.sub(_TRAILING_COMMA_RE, r"\1", text)
-    return text
+    return _SANITIZE_RE.sub(_sanitize_repl, text)
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
 
 
 def load_json(path: Path) -> Any:
     raw = path.read_text(encoding="utf-8")
-    clean = sanitize_json(raw)
-    return json.loads(clean)
+    try:
+        # caminho comum: JSON já válido, sem comentários/vírgulas finais
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return json.loads(sanitize_json(raw))
 
 
 def save_json(path: Path, data: Any) -> None:
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    # grava num temporário e troca atomicamente: um crash não corrompe o arquivo
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(_dumps(data))
+            f.flush()
+            os.fsync(f.fileno())  # conteúdo em disco antes da troca
+        try:
+            # preserva as permissões do arquivo original
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 # ==========================
@@ -93,6 +153,7 @@ def load_assets() -> Tuple[Any, List[Dict[str, Any]], Optional[str]]:
     """
     data = load_json(ASSETS_FILE)
     assets, key = _extract_assets_container(data)
+    # a data de nascimento é parseada sob demanda (e uma única vez) por _asset_ymd
     return data, assets, key
 
 
@@ -102,17 +163,43 @@ def load_assets() -> Tuple[Any, List[Dict[str, Any]], Optional[str]]:
 
 
 def parse_date(date_str: str) -> Optional[datetime]:
+    # ISO "YYYY-MM-DD" estrito (zero à esquerda), fatiado à mão
+    # (strptime é caro: locale + regex do formato)
+    if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+        return None
+    # int() aceitaria sinal, espaços e "_": exige os 8 dígitos ASCII
+    digits = date_str[0:4] + date_str[5:7] + date_str[8:10]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
     try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except Exception:
+        return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+    except ValueError:
         return None
 
 
-def calcular_idade(data_nasc: datetime, hoje: datetime) -> int:
-    idade = hoje.year - data_nasc.year
-    if (hoje.month, hoje.day) < (data_nasc.month, data_nasc.day):
-        idade -= 1
-    return idade
+def _dob_ymd(date_str: str) -> Optional[Tuple[int, int, int]]:
+    dt = parse_date(date_str)
+    return (dt.year, dt.month, dt.day) if dt else None
+
+
+def _asset_ymd(a: Dict[str, Any]) -> Optional[Tuple[int, int, int]]:
+    """
+    Retorna (ano, mês, dia) do nascimento, cacheado no próprio dict em DOB_KEY.
+    """
+    if DOB_KEY not in a:
+        a[DOB_KEY] = _dob_ymd(str(a.get("data_nascimento", "")).strip())
+    return a[DOB_KEY]
+
+
+def _strip_cache(assets: List[Dict[str, Any]]) -> None:
+    # remove chaves privadas antes de persistir
+    for a in assets:
+        a.pop(DOB_KEY, None)
+
+
+def calcular_idade(y: int, m: int, d: int, today_y: int, today_mmdd: int) -> int:
+    # mmdd = mês * 100 + dia: uma comparação de int, sem montar tuplas
+    return today_y - y - (today_mmdd < m * 100 + d)
 
 
 # ==========================
@@ -120,51 +207,112 @@ def calcular_idade(data_nasc: datetime, hoje: datetime) -> int:
 # ==========================
 
 
-def aniversariantes_mes(assets: List[Dict[str, Any]], mes: int) -> List[Dict[str, Any]]:
+def _dob_columns(
+    assets: List[Dict[str, Any]], mes: int = 0
+) -> Tuple[List[int], List[int], List[int], List[int]]:
+    """
+    Colunas paralelas (índice, ano, mês, dia) dos ativos com nascimento válido.
+    Com `mes`, ativos ainda não parseados de outro mês são descartados só
+    olhando o "MM" da string, sem parse.
+    """
+    mm = f"{mes:02d}"
+    idx: List[int] = []
+    ys: List[int] = []
+    ms: List[int] = []
+    ds: List[int] = []
+    for i, a in enumerate(assets):
+        if mes and DOB_KEY not in a:
+            s = str(a.get("data_nascimento", "")).strip()
+            if len(s) != 10 or s[5:7] != mm:
+                continue
+        ymd = _asset_ymd(a)
+        if ymd:
+            idx.append(i)
+            ys.append(ymd[0])
+            ms.append(ymd[1])
+            ds.append(ymd[2])
+    return idx, ys, ms, ds
+
+
+def _filter_month(
+    years: List[int],
+    months: List[int],
+    days: List[int],
+    today_y: int,
+    today_m: int,
+    today_d: int,
+    mes: int = 0,
+) -> Tuple[List[int], List[int]]:
+    """
+    Kernel inteiro: retorna (posições, idades) dos nascidos em `mes`
+    (mes=0 → todos). Só aritmética de ints, nada de strings/datetime.
+    """
+    today_mmdd = today_m * 100 + today_d
+    sel: List[int] = []
+    idades: List[int] = []
+    for k in range(len(months)):
+        m = months[k]
+        if mes and m != mes:
+            continue
+        sel.append(k)
+        idades.append(calcular_idade(years[k], m, days[k], today_y, today_mmdd))
+    return sel, idades
+
+
+def aniversariantes_mes(assets: List[Dict[str, Any]], mes: int) -> List[Birthday]:
     hoje = datetime.today()
-    resultados: List[Dict[str, Any]] = []
+    idx, ys, ms, ds = _dob_columns(assets, mes)
+    sel, idades = _filter_month(ys, ms, ds, hoje.year, hoje.month, hoje.day, mes)
 
-    for a in assets:
-        dt = parse_date(str(a.get("data_nascimento", "")).strip())
-        if not dt or dt.month != mes:
-            continue
+    # dia crescente; dentro do dia, mais velho -> mais novo
+    order = sorted(range(len(sel)), key=lambda j: (ds[sel[j]], -idades[j]))
 
+    resultados: List[Birthday] = []
+    for j in order:
+        k = sel[j]
+        a = assets[idx[k]]
         resultados.append(
-            {
-                "nome": a.get("nome", "") or "",
-                "sobrenome": a.get("sobrenome", "") or "",
-                "data": dt,
-                "idade": calcular_idade(dt, hoje),
-            }
+            Birthday(
+                a.get("nome", "") or "",
+                a.get("sobrenome", "") or "",
+                ys[k],
+                ms[k],
+                ds[k],
+                idades[j],
+            )
         )
-
-    # dia crescente; dentro do dia, mais velho -> mais novo
-    return sorted(resultados, key=lambda x: (x["data"].day, -x["idade"]))
+    return resultados
 
 
-def aniversariantes_ano(assets: List[Dict[str, Any]]):
+def aniversariantes_ano(
+    assets: List[Dict[str, Any]],
+) -> Dict[Tuple[int, int], List[Birthday]]:
+    """
+    Retorna {(mês, dia): [aniversariantes]}, com as chaves já em ordem
+    cronológica e cada dia do mais velho para o mais novo.
+    """
     hoje = datetime.today()
-    calendario = defaultdict(lambda: defaultdict(list))
-
-    for a in assets:
-        dt = parse_date(str(a.get("data_nascimento", "")).strip())
-        if not dt:
-            continue
-
-        calendario[dt.month][dt.day].append(
-            {
-                "nome": a.get("nome", "") or "",
-                "sobrenome": a.get("sobrenome", "") or "",
-                "data": dt,
-                "idade": calcular_idade(dt, hoje),
-            }
+    calendario: Dict[Tuple[int, int], List[Birthday]] = {}
+    idx, ys, ms, ds = _dob_columns(assets)
+    sel, idades = _filter_month(ys, ms, ds, hoje.year, hoje.month, hoje.day)
+
+    # uma única ordenação (mês, dia, mais velho -> mais novo), estilo lexsort
+    order = sorted(range(len(sel)), key=lambda j: (ms[sel[j]], ds[sel[j]], -idades[j]))
+
+    for j in order:
+        k = sel[j]
+        a = assets[idx[k]]
+        calendario.setdefault((ms[k], ds[k]), []).append(
+            Birthday(
+                a.get("nome", "") or "",
+                a.get("sobrenome", "") or "",
+                ys[k],
+                ms[k],
+                ds[k],
+                idades[j],
+            )
         )
 
-    # mais velho -> mais novo em cada dia
-    for mes in calendario:
-        for dia in calendario[mes]:
-            calendario[mes][dia].sort(key=lambda x: -x["idade"])
-
     return calendario
 
 
@@ -181,14 +329,20 @@ def atualizar_idades() -> None:
         print("❌ Nenhum ativo encontrado em assets.json.")
         sys.exit(1)
 
+    # "hoje" resolvido uma vez, fora do loop
+    ty = hoje.year
+    tmd = hoje.month * 100 + hoje.day
+
     atualizados = 0
     for a in assets:
-        dt = parse_date(str(a.get("data_nascimento", "")).strip())
-        if not dt:
+        ymd = _asset_ymd(a)
+        if not ymd:
             continue
-        a["idade"] = calcular_idade(dt, hoje)
+        a["idade"] = calcular_idade(*ymd, ty, tmd)
         atualizados += 1
 
+    _strip_cache(assets)
+
     # re-injeta no container original
     if container_key is None:
         # lista pura
@@ -208,51 +362,38 @@ def atualizar_idades() -> None:
 # ==========================
 
 
-def print_mes(resultados: List[Dict[str, Any]], mes: int) -> None:
+# linha da tabela (dia, nome, sobrenome, nascimento, idade), já com "\n"
+ROW = "{:<5} {:<15} {:<20} {:<12} {}\n".format
+TABLE_HEADER = ROW("Dia", "Nome", "Sobrenome", "Nascimento", "Idade") + "-" * 70 + "\n"
+
+
+def print_mes(resultados: List[Birthday], mes: int) -> None:
     if not resultados:
         print("🎂 Nenhum aniversariante encontrado.\n")
         return
 
-    print(f"\n📅 ANIVERSARIANTES DE {MESES_PT[mes]}\n")
-    print(f"{'Dia':<5} {'Nome':<15} {'Sobrenome':<20} {'Nascimento':<12} {'Idade'}")
-    print("-" * 70)
-
-    for r in resultados:
-        dia = r["data"].day
-        print(
-            f"{dia:<5} "
-            f"{r['nome']:<15} "
-            f"{r['sobrenome']:<20} "
-            f"{r['data'].strftime('%d/%m/%Y'):<12} "
-            f"{r['idade']}"
-        )
-    print()
+    lines = [f"\n📅 ANIVERSARIANTES DE {MESES_PT[mes]}\n\n", TABLE_HEADER]
+    lines.extend(
+        ROW(r.dia, r.nome, r.sobrenome, r.nascimento, r.idade) for r in resultados
+    )
+    lines.append("\n")
+    sys.stdout.writelines(lines)
 
 
-def print_ano(calendario) -> None:
+def print_ano(calendario: Dict[Tuple[int, int], List[Birthday]]) -> None:
     if not calendario:
         print("🎂 Nenhum aniversariante encontrado.\n")
         return
 
     print("\n📆 CALENDÁRIO ANUAL DE ANIVERSÁRIOS\n")
 
-    for mes in range(1, 13):
-        if mes not in calendario:
-            continue
-
-        print(f"\n🗓️  MÊS DE {MESES_PT[mes]}")
-        print(f"{'Dia':<5} {'Nome':<15} {'Sobrenome':<20} {'Nascimento':<12} {'Idade'}")
-        print("-" * 70)
-
-        for dia in sorted(calendario[mes]):
-            for r in calendario[mes][dia]:
-                print(
-                    f"{dia:<5} "
-                    f"{r['nome']:<15} "
-                    f"{r['sobrenome']:<20} "
-                    f"{r['data'].strftime('%d/%m/%Y'):<12} "
-                    f"{r['idade']}"
-                )
+    for mes, dias in groupby(sorted(calendario.items()), key=lambda kv: kv[0][0]):
+        lines = [f"\n🗓️  MÊS DE {MESES_PT[mes]}\n", TABLE_HEADER]
+        for (_, dia), rs in dias:
+            lines.extend(
+                ROW(dia, r.nome, r.sobrenome, r.nascimento, r.idade) for r in rs
+            )
+        sys.stdout.writelines(lines)
 
 
 # ==========================
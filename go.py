@@ -1,15 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import json
 import os
-import re
-import shlex
-import shutil
 import sys
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 # ==================================================
 # Paths (4 JSONs)
@@ -29,50 +27,73 @@ OUTPUT_FILE = BASE_DIR / "prompt_out.txt"
 # ANSI + display width (wcwidth-like, sem dependência)
 # ==================================================
 
-ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
-
-
-def strip_ansi(s: str) -> str:
-    return ANSI_RE.sub("", s or "")
-
-
-def _char_width(ch: str) -> int:
-    # Heurística “boa o bastante” sem dependência:
-    # - CJK / Fullwidth / Emoji geralmente ocupam 2 colunas
-    # - ASCII e a maioria das letras ocupam 1
-    o = ord(ch)
-    # controles
-    if o == 0:
-        return 0
-    if o < 32 or 0x7F <= o < 0xA0:
-        return 0
-
-    # Faixas típicas de wide/fullwidth (CJK + símbolos + emoji)
-    wide_ranges = [
-        (0x1100, 0x115F),
-        (0x2329, 0x232A),
-        (0x2E80, 0xA4CF),
-        (0xAC00, 0xD7A3),
-        (0xF900, 0xFAFF),
-        (0xFE10, 0xFE19),
-        (0xFE30, 0xFE6F),
-        (0xFF00, 0xFF60),
-        (0xFFE0, 0xFFE6),
-        (0x1F300, 0x1FAFF),  # emoji
-        (0x20000, 0x3FFFD),
-    ]
-    for a, b in wide_ranges:
-        if a <= o <= b:
-            return 2
-    return 1
+# Heurística “boa o bastante” sem dependência:
+# - CJK / Fullwidth / Emoji geralmente ocupam 2 colunas
+# - ASCII e a maioria das letras ocupam 1
+# - controles ocupam 0
+_WIDE_RANGES = (
+    (0x1100, 0x115F),
+    (0x2329, 0x232A),
+    (0x2E80, 0xA4CF),
+    (0xAC00, 0xD7A3),
+    (0xF900, 0xFAFF),
+    (0xFE10, 0xFE19),
+    (0xFE30, 0xFE6F),
+    (0xFF00, 0xFF60),
+    (0xFFE0, 0xFFE6),
+    (0x1F300, 0x1FAFF),  # emoji
+    (0x20000, 0x3FFFD),
+)
+
+
+@lru_cache(maxsize=None)
+def _width_table() -> bytearray:
+    # codepoint -> largura (0/1/2), ~1 MB: montada só na primeira medida
+    # não-ASCII (os modos de prompt nunca medem largura)
+    table = bytearray(b"\x01") * 0x110000
+    table[0x00:0x20] = bytes(0x20)
+    table[0x7F:0xA0] = bytes(0x21)
+    for a, b in _WIDE_RANGES:
+        table[a : b + 1] = b"\x02" * (b - a + 1)
+    return table
+
+
+def _is_plain_ascii(s: str) -> bool:
+    # ASCII imprimível: largura == len(s) (sem ANSI, já que ESC não é imprimível)
+    return s.isascii() and s.isprintable()
 
 
 def display_width(s: str) -> int:
-    s = strip_ansi(s or "")
-    return sum(_char_width(ch) for ch in s)
+    s = s or ""
+    if _is_plain_ascii(s):
+        return len(s)
+    table = _width_table()
+    # lookup por tabela, sem branches por caractere (map/sum rodam em C)
+    if "\x1b" not in s:
+        return sum(map(table.__getitem__, map(ord, s)))
+
+    # com ANSI: uma passada só, pulando as sequências (ESC "[" dígitos/";" "m"),
+    # sem materializar a string "limpa"
+    w = 0
+    i = 0
+    n = len(s)
+    while i < n:
+        ch = s[i]
+        if ch == "\x1b" and i + 1 < n and s[i + 1] == "[":
+            j = i + 2
+            while j < n and s[j] in "0123456789;":
+                j += 1
+            if j < n and s[j] == "m":
+                i = j + 1
+                continue
+        w += table[ord(ch)]
+        i += 1
+    return w
 
 
 def pad_right(s: str, width: int) -> str:
+    if _is_plain_ascii(s):
+        return s.ljust(width)
     w = display_width(s)
     if w >= width:
         return s
@@ -96,10 +117,23 @@ def load_json(path: Path) -> Dict[str, Any]:
         sys.exit(1)
 
 
+def write_bytes(path: Path, data: bytes) -> None:
+    # os.write cru: sem camada de texto/buffer, já em disco antes do exec do pager
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=2048)
 def _norm(s: str) -> str:
     return (s or "").strip().lower()
 
 
+@lru_cache(maxsize=2048)
 def _title(s: str) -> str:
     s = (s or "").strip()
     return s[:1].upper() + s[1:] if s else s
@@ -110,6 +144,7 @@ def _safe_join(items: List[str], sep: str = ", ") -> str:
     return sep.join(clean)
 
 
+@lru_cache(maxsize=2048)
 def _klabel(key: str) -> str:
     return (key or "").replace("_", " ").strip()
 
@@ -194,65 +229,150 @@ def get_config(data: Any) -> Dict[str, Any]:
     return data if isinstance(data, dict) else {}
 
 
+def _columns(items: List[Dict[str, Any]], *keys: str) -> List[List[str]]:
+    # AoS -> SoA: uma lista de strings (strip) por chave, paralelas a `items`
+    cols: List[List[str]] = [[] for _ in keys]
+    for it in items:
+        for col, k in zip(cols, keys):
+            col.append(str(it.get(k, "")).strip())
+    return cols
+
+
+def asset_columns(assets: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """
+    Retorna (asset_ids, nomes_completos), paralelos à lista de ativos.
+    """
+    ids: List[str] = []
+    fulls: List[str] = []
+    for a in assets:
+        ids.append(str(a.get("asset_id", "")).strip())
+        fulls.append(f"{a.get('nome', '')} {a.get('sobrenome', '')}".strip())
+    return ids, fulls
+
+
+# campos textuais do ativo (str + strip), na ordem de AssetRec
+_ASSET_TEXT_FIELDS = (
+    "asset_id",
+    "nome",
+    "sobrenome",
+    "data_nascimento",
+    "signo",
+    "cor_cabelo",
+    "corte_penteado",
+    "cor_pele",
+    "cor_olhos",
+    "estrutura_corpo",
+    "personalidade",
+    "ascendente",
+)
+
+# campos numéricos, mantidos crus (emit_asset checa o tipo)
+_ASSET_RAW_FIELDS = (
+    "idade",
+    "altura_cm",
+    "peso_kg",
+    "tecido_adiposo",
+    "musculatura",
+    "ascendente_confianca",
+)
+
+
+class AssetRec(NamedTuple):
+    """Ativo já normalizado para prompt/resolução (montado uma vez no load)."""
+
+    full_name: str
+    asset_id: str
+    nome: str
+    sobrenome: str
+    data_nascimento: str
+    signo: str
+    cor_cabelo: str
+    corte_penteado: str
+    cor_pele: str
+    cor_olhos: str
+    estrutura_corpo: str
+    personalidade: str
+    ascendente: str
+    idade: Any
+    altura_cm: Any
+    peso_kg: Any
+    tecido_adiposo: Any
+    musculatura: Any
+    ascendente_confianca: Any
+
+
+def _field_text(a: Dict[str, Any], key: str) -> str:
+    v = a.get(key, "")
+    # str já é o caso comum: evita o str() intermediário
+    return v.strip() if isinstance(v, str) else str(v).strip()
+
+
+def asset_record(a: Dict[str, Any]) -> AssetRec:
+    text = [_field_text(a, k) for k in _ASSET_TEXT_FIELDS]
+    full = f"{text[1]} {text[2]}".strip()
+    return AssetRec(full, *text, *(a.get(k) for k in _ASSET_RAW_FIELDS))
+
+
 # ==================================================
 # Resolvers (aceitam ID ou nome)
 # ==================================================
 
 
-def resolve_space(spaces: List[Dict[str, Any]], token: str) -> Optional[Dict[str, Any]]:
-    t = _norm(token)
-    for s in spaces:
-        if _norm(str(s.get("id", ""))) == t:
-            return s
-        if _norm(str(s.get("name", ""))) == t:
-            return s
-    return None
-
-
-def resolve_universe(
-    universes: List[Dict[str, Any]], token: str
-) -> Optional[Dict[str, Any]]:
-    t = _norm(token)
-    for u in universes:
-        if _norm(str(u.get("id", ""))) == t:
-            return u
-        if _norm(str(u.get("name", ""))) == t:
-            return u
-    return None
-
-
-def resolve_assets(
-    assets: List[Dict[str, Any]], tokens: List[str]
-) -> List[Dict[str, Any]]:
-    resolved: List[Dict[str, Any]] = []
+# índice: valor normalizado (id/nome) -> item; o primeiro item da lista vence
+Index = Dict[str, Dict[str, Any]]
+
+
+def _index_by(items: List[Dict[str, Any]], *keys: str) -> Index:
+    idx: Index = {}
+    for item in items:
+        for k in keys:
+            v = _norm(str(item.get(k, "")))
+            if v:
+                # chaves internadas: o compare com o token vira igualdade de ponteiro
+                idx.setdefault(sys.intern(v), item)
+    return idx
+
+
+# resolvers de token recebem a chave já normalizada (Token.key)
+def resolve_space(space_idx: Index, key: str) -> Optional[Dict[str, Any]]:
+    return space_idx.get(key)
+
+
+def resolve_universe(universe_idx: Index, key: str) -> Optional[Dict[str, Any]]:
+    return universe_idx.get(key)
+
+
+AssetIndex = Dict[str, AssetRec]
+
+
+def index_assets(records: List[AssetRec]) -> AssetIndex:
+    # asset_id e nome completo normalizados -> ativo (o primeiro da lista vence)
+    idx: AssetIndex = {}
+    for r in records:
+        for k in (_norm(r.asset_id), _norm(r.full_name)):
+            if k:
+                idx.setdefault(sys.intern(k), r)
+    return idx
+
+
+def resolve_assets(asset_idx: AssetIndex, tokens: List["Token"]) -> List[AssetRec]:
+    resolved: List[AssetRec] = []
     seen = set()
     for tok in tokens:
-        t = _norm(tok)
-        found = None
-        for a in assets:
-            aid = _norm(str(a.get("asset_id", "")))
-            full = _norm(f"{a.get('nome', '')} {a.get('sobrenome', '')}".strip())
-            if t == aid or t == full:
-                found = a
-                break
-        if found:
-            key = _norm(str(found.get("asset_id", "")) or full)
-            if key not in seen:
-                resolved.append(found)
-                seen.add(key)
-        else:
-            print(f"⚠️ Ativo não encontrado: {tok}")
+        found = asset_idx.get(tok.key)
+        if found is None:
+            print(f"⚠️ Ativo não encontrado: {tok.raw}")
+            continue
+        # dedup pela identidade do ativo (asset_id, ou nome completo sem id)
+        key = _norm(found.asset_id) or _norm(found.full_name)
+        if key not in seen:
+            resolved.append(found)
+            seen.add(key)
     return resolved
 
 
-def resolve_cluster(
-    clusters: List[Dict[str, Any]], cluster_id: str
-) -> Optional[Dict[str, Any]]:
-    t = _norm(cluster_id)
-    for c in clusters:
-        if _norm(str(c.get("cluster_id", ""))) == t:
-            return c
-    return None
+def resolve_cluster(cluster_idx: Index, cluster_id: str) -> Optional[Dict[str, Any]]:
+    return cluster_idx.get(_norm(cluster_id))
 
 
 # ==================================================
@@ -260,17 +380,22 @@ def resolve_cluster(
 # ==================================================
 
 
-def _sanitize_argv(argv: List[str]) -> List[str]:
+class Token(NamedTuple):
+    raw: str  # como digitado (para mensagens)
+    key: str  # normalizado uma vez (strip + lower), pronto para os índices
+
+
+def _sanitize_argv(argv: List[str]) -> List[Token]:
     # junta tudo, depois separa por espaços, vírgulas e "+"
     joined = " ".join(argv).strip()
     if not joined:
         return []
     joined = joined.replace("+", " ")
-    parts = []
+    parts: List[Token] = []
     for chunk in joined.split():
         # separa por vírgulas
         sub = [x.strip() for x in chunk.split(",") if x.strip()]
-        parts.extend(sub)
+        parts.extend(Token(x, sys.intern(x.lower())) for x in sub)
     return parts
 
 
@@ -299,17 +424,13 @@ def build_left_column(
 ) -> List[str]:
     lines: List[str] = []
     lines.append(_hdr("🌌 UNIVERSOS", C_BLUE))
-    for u in universes:
-        uid = str(u.get("id", "")).strip()
-        name = str(u.get("name", "")).strip()
+    for uid, name in zip(*_columns(universes, "id", "name")):
         if uid or name:
             lines.append(f"{uid:<5} {name}".rstrip())
 
     lines.append("")  # spacer
     lines.append(_hdr("📍 ESPAÇOS", C_BLUE))
-    for s in spaces:
-        sid = str(s.get("id", "")).strip()
-        name = str(s.get("name", "")).strip()
+    for sid, name in zip(*_columns(spaces, "id", "name")):
         if sid or name:
             lines.append(f"{sid:<5} {name}".rstrip())
     return lines
@@ -318,9 +439,7 @@ def build_left_column(
 def build_right_column(assets: List[Dict[str, Any]]) -> List[str]:
     lines: List[str] = []
     lines.append(_hdr("👤 ATIVOS", C_BLUE))
-    for a in assets:
-        aid = str(a.get("asset_id", "")).strip()
-        full = f"{a.get('nome', '')} {a.get('sobrenome', '')}".strip()
+    for aid, full in zip(*asset_columns(assets)):
         if aid or full:
             lines.append(f"{aid:<5} {full}".rstrip())
     return lines
@@ -335,10 +454,13 @@ def print_dashboard(
     top = "┌──────────────────────── MATRIX :: CONSOLE ────────────────────────┐"
     mid = "│ STATUS: READY            MODE: GENERATOR           VERSION: 1.0   │"
     bot = "└───────────────────────────────────────────────────────────────────┘"
-    print(_hdr(top, C_GRAY))
-    print(_hdr(mid, C_GRAY))
-    print(_hdr(bot, C_GRAY))
-    print()
+    # monta o painel inteiro num buffer e escreve de uma vez
+    buf = io.StringIO()
+    w = buf.write
+    w(_hdr(top, C_GRAY) + "\n")
+    w(_hdr(mid, C_GRAY) + "\n")
+    w(_hdr(bot, C_GRAY) + "\n")
+    w("\n")
 
     left = build_left_column(universes, spaces)
     right = build_right_column(assets)
@@ -348,9 +470,10 @@ def print_dashboard(
     for i in range(rows):
         l = left[i] if i < len(left) else ""
         r = right[i] if i < len(right) else ""
-        print(pad_right(l, left_width) + r)
+        w(pad_right(l, left_width) + r + "\n")
 
-    print()
+    w("\n")
+    sys.stdout.write(buf.getvalue())
 
 
 # ==================================================
@@ -360,7 +483,7 @@ def print_dashboard(
 
 def attach_cluster_if_needed(
     space: Dict[str, Any],
-    clusters: List[Dict[str, Any]],
+    cluster_idx: Index,
     assets_count: int,
 ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     binding = space.get("cluster_binding")
@@ -374,7 +497,7 @@ def attach_cluster_if_needed(
     if not cluster_id:
         return None, None
 
-    cluster = resolve_cluster(clusters, cluster_id)
+    cluster = resolve_cluster(cluster_idx, cluster_id)
     if not cluster and requires:
         print(
             f"❌ Space exige cluster {cluster_id}, mas ele não existe em spaces.json."
@@ -401,11 +524,9 @@ def attach_cluster_if_needed(
 
 def describe_universe(u: Dict[str, Any]) -> str:
     name = str(u.get("name", "")).strip() or "Universo sem nome"
-    lines: List[str] = []
-    lines.append("## UNIVERSO ATIVO")
-    lines.append("")
-    lines.append(f"**{name}**")
-    lines.append("")
+    buf = io.StringIO()
+    buf.write("## UNIVERSO ATIVO\n\n")
+    buf.write(f"**{name}**\n\n")
 
     # imprime metadados do universo, sem despejar JSON
     meta_keys = [
@@ -428,21 +549,19 @@ def describe_universe(u: Dict[str, Any]) -> str:
             if txt:
                 bits.append(f"- {_title(_klabel(k))}: {txt}")
     if bits:
-        lines.append("### Metadados")
-        lines.extend(bits)
-        lines.append("")
-    return "\n".join(lines).strip() + "\n"
+        buf.write("### Metadados\n")
+        buf.writelines(f"{b}\n" for b in bits)
+        buf.write("\n")
+    return buf.getvalue().strip() + "\n"
 
 
 def describe_space(
     space: Dict[str, Any], cluster: Optional[Dict[str, Any]], variation: Optional[str]
 ) -> str:
     name = str(space.get("name", "")).strip() or "Espaço sem nome"
-    lines: List[str] = []
-    lines.append("## ESPAÇO ATIVO")
-    lines.append("")
-    lines.append(f"**{name}**")
-    lines.append("")
+    buf = io.StringIO()
+    buf.write("## ESPAÇO ATIVO\n\n")
+    buf.write(f"**{name}**\n\n")
 
     # cluster metadata (se aplicável)
     if cluster:
@@ -451,15 +570,13 @@ def describe_space(
             or str(cluster.get("cluster_id", "")).strip()
         )
         cdesc = str(cluster.get("description", "")).strip()
-        lines.append("### Cluster (contrato transversal)")
-        lines.append(f"- Nome: {cname}")
+        buf.write("### Cluster (contrato transversal)\n")
+        buf.write(f"- Nome: {cname}\n")
         if cdesc:
-            lines.append(f"- Descrição: {cdesc}")
+            buf.write(f"- Descrição: {cdesc}\n")
         if variation:
-            lines.append(
-                f"- Variação inferida: {variation} (pela quantidade de ativos)"
-            )
-        lines.append("")
+            buf.write(f"- Variação inferida: {variation} (pela quantidade de ativos)\n")
+        buf.write("\n")
 
         contract = cluster.get("contract")
         if isinstance(contract, dict):
@@ -468,43 +585,43 @@ def describe_space(
             req = contract.get("execution_requirements")
 
             if isinstance(core, list) and core:
-                lines.append("**Princípios do cluster (sempre presentes):**")
+                buf.write("**Princípios do cluster (sempre presentes):**\n")
                 for x in core:
                     if isinstance(x, str) and x.strip():
-                        lines.append(f"- {x.strip()}")
-                lines.append("")
+                        buf.write(f"- {x.strip()}\n")
+                buf.write("\n")
 
             if isinstance(forb, list) and forb:
-                lines.append("**Proibido no cluster:**")
+                buf.write("**Proibido no cluster:**\n")
                 for x in forb:
                     if isinstance(x, str) and x.strip():
-                        lines.append(f"- {x.strip()}")
-                lines.append("")
+                        buf.write(f"- {x.strip()}\n")
+                buf.write("\n")
 
             if isinstance(req, dict) and req:
-                lines.append("**Requisitos mínimos de execução:**")
+                buf.write("**Requisitos mínimos de execução:**\n")
                 for kk, vv in req.items():
                     txt = _value_to_text(vv)
                     if txt:
-                        lines.append(f"- {_klabel(kk)}: {txt}")
-                lines.append("")
+                        buf.write(f"- {_klabel(kk)}: {txt}\n")
+                buf.write("\n")
 
         # variations no cluster (somente como possibilidade; não cria modo novo)
         vars_ = cluster.get("variations")
         if isinstance(vars_, dict) and vars_:
-            lines.append("**Variações possíveis (schema):**")
+            buf.write("**Variações possíveis (schema):**\n")
             for vname, vobj in vars_.items():
                 if not vname:
                     continue
                 if isinstance(vobj, dict) and vobj:
                     desc = _value_to_text(vobj)
                     if desc:
-                        lines.append(f"- {vname}: {desc}")
+                        buf.write(f"- {vname}: {desc}\n")
                     else:
-                        lines.append(f"- {vname}")
+                        buf.write(f"- {vname}\n")
                 else:
-                    lines.append(f"- {vname}")
-            lines.append("")
+                    buf.write(f"- {vname}\n")
+            buf.write("\n")
 
     # campos semânticos do space: preserva, sem virar “código”
     skip = {"id", "cluster_binding"}  # nunca expor id
@@ -544,196 +661,161 @@ def describe_space(
             extras.append(f"- {_title(_klabel(k))}: {txt}")
 
     if bullets or extras:
-        lines.append("### Parâmetros do espaço (base para execução)")
-        lines.extend(bullets)
-        lines.extend(extras)
-        lines.append("")
-
-    return "\n".join(lines).strip() + "\n"
+        buf.write("### Parâmetros do espaço (base para execução)\n")
+        buf.writelines(f"{b}\n" for b in bullets)
+        buf.writelines(f"{b}\n" for b in extras)
+        buf.write("\n")
 
+    return buf.getvalue().strip() + "\n"
 
-def describe_asset(a: Dict[str, Any]) -> str:
-    nome = str(a.get("nome", "")).strip()
-    sobrenome = str(a.get("sobrenome", "")).strip()
-    full = f"{nome} {sobrenome}".strip() or "Ativo sem nome"
 
-    nasc = str(a.get("data_nascimento", "")).strip()
-    signo = str(a.get("signo", "")).strip()
-    altura = a.get("altura_cm", None)
-    peso = a.get("peso_kg", None)
-    idade = a.get("idade", None)
+def _emit_joined(out: List[str], prefix: str, items: List[str], sep: str) -> None:
+    # equivalente a out.append(prefix + sep.join(items)), sem a string intermediária
+    out.append(prefix)
+    out.append(items[0])
+    for x in items[1:]:
+        out.append(sep)
+        out.append(x)
 
-    cabelo = str(a.get("cor_cabelo", "")).strip()
-    corte = str(a.get("corte_penteado", "")).strip()
-    pele = str(a.get("cor_pele", "")).strip()
-    olhos = str(a.get("cor_olhos", "")).strip()
 
-    estrutura = str(a.get("estrutura_corpo", "")).strip()
-    tecido = a.get("tecido_adiposo", None)
-    musc = a.get("musculatura", None)
-
-    personalidade = str(a.get("personalidade", "")).strip()
-    asc = str(a.get("ascendente", "")).strip()
-    asc_conf = a.get("ascendente_confianca", None)
+def emit_asset(a: AssetRec, out: List[str]) -> None:
+    """
+    Anexa a descrição do ativo em `out` (fragmentos; o chamador faz um único join).
+    """
+    out.append(f"- **{a.full_name or 'Ativo sem nome'}**\n")
 
-    bits = []
     # dados
     dados = []
-    if nasc:
-        dados.append(f"nascimento {nasc}")
-    if isinstance(idade, int):
-        dados.append(f"idade {idade}")
-    if signo:
-        dados.append(f"signo {signo}")
-    if isinstance(altura, int):
-        dados.append(f"altura {altura} cm")
-    if isinstance(peso, (int, float)):
-        dados.append(f"peso {peso} kg")
-
+    if a.data_nascimento:
+        dados.append(f"nascimento {a.data_nascimento}")
+    if isinstance(a.idade, int):
+        dados.append(f"idade {a.idade}")
+    if a.signo:
+        dados.append(f"signo {a.signo}")
+    if isinstance(a.altura_cm, int):
+        dados.append(f"altura {a.altura_cm} cm")
+    if isinstance(a.peso_kg, (int, float)):
+        dados.append(f"peso {a.peso_kg} kg")
     if dados:
-        bits.append(f"- Dados: " + "; ".join(dados))
+        _emit_joined(out, "- Dados: ", dados, "; ")
+        out.append("\n")
 
     # aparência
     apar = []
-    if cabelo:
-        apar.append(f"cabelo {cabelo}")
-    if corte:
-        apar.append(f"corte {corte}")
-    if pele:
-        apar.append(f"pele {pele}")
-    if olhos:
-        apar.append(f"olhos {olhos}")
+    if a.cor_cabelo:
+        apar.append(f"cabelo {a.cor_cabelo}")
+    if a.corte_penteado:
+        apar.append(f"corte {a.corte_penteado}")
+    if a.cor_pele:
+        apar.append(f"pele {a.cor_pele}")
+    if a.cor_olhos:
+        apar.append(f"olhos {a.cor_olhos}")
     if apar:
-        bits.append(f"- Aparência: " + "; ".join(apar))
+        _emit_joined(out, "- Aparência: ", apar, "; ")
+        out.append("\n")
 
     # corpo
     corpo = []
-    if estrutura:
-        corpo.append(estrutura)
-    if isinstance(tecido, int):
-        corpo.append(f"tecido adiposo {tecido}/100")
-    if isinstance(musc, int):
-        corpo.append(f"musculatura {musc}/100")
+    if a.estrutura_corpo:
+        corpo.append(a.estrutura_corpo)
+    if isinstance(a.tecido_adiposo, int):
+        corpo.append(f"tecido adiposo {a.tecido_adiposo}/100")
+    if isinstance(a.musculatura, int):
+        corpo.append(f"musculatura {a.musculatura}/100")
     if corpo:
-        bits.append(f"- Corpo: " + " — ".join(corpo))
+        _emit_joined(out, "- Corpo: ", corpo, " — ")
+        out.append("\n")
 
     # personalidade / ascendente
     pers = []
-    if personalidade:
-        pers.append(personalidade)
-    if asc:
-        if isinstance(asc_conf, int):
-            pers.append(f"ascendente {asc} (confiança {asc_conf}/100)")
+    if a.personalidade:
+        pers.append(a.personalidade)
+    if a.ascendente:
+        if isinstance(a.ascendente_confianca, int):
+            pers.append(
+                f"ascendente {a.ascendente} (confiança {a.ascendente_confianca}/100)"
+            )
         else:
-            pers.append(f"ascendente {asc}")
+            pers.append(f"ascendente {a.ascendente}")
     if pers:
-        bits.append(f"- Personalidade: " + " | ".join(pers))
+        _emit_joined(out, "- Personalidade: ", pers, " | ")
+        out.append("\n")
 
     # vestuário (regra fixa do sistema)
-    bits.append(
+    out.append(
         "- Vestuário: marcas premium e bonitas, escolhidas livremente conforme o contexto (o figurino responde ao ambiente)."
     )
 
-    return f"- **{full}**\n" + "\n".join(bits)
-
 
-def render_assets_block(selected_assets: List[Dict[str, Any]]) -> str:
-    lines: List[str] = []
-    lines.append("## ATIVOS PRESENTES")
-    lines.append("")
+def emit_assets_block(selected_assets: List[AssetRec], out: List[str]) -> None:
+    out.append("## ATIVOS PRESENTES\n\n")
     for a in selected_assets:
-        lines.append(describe_asset(a))
-    lines.append("")
-    return "\n".join(lines)
-
-
-def render_direction_block() -> str:
-    return "\n".join(
-        [
-            "## DIREÇÃO CRIATIVA (liberdade do Gemini)",
-            "",
-            "- Use as informações como base e expanda com criatividade, sem travar em formato.",
-            "- Você pode criar espaços, detalhes e dinâmica social quando necessário para o mundo funcionar.",
-            "- Não liste IDs/códigos no texto. Trate tudo como descrição humana e visual.",
-            "- Continuidade pode ser local ao chat; um novo prompt pode redefinir o setup.",
-            "- A pausa e o silêncio também são conteúdo.",
-            "",
-        ]
-    )
+        emit_asset(a, out)
+        out.append("\n")
+
+
+_DIRECTION_BLOCK = "\n".join(
+    [
+        "## DIREÇÃO CRIATIVA (liberdade do Gemini)",
+        "",
+        "- Use as informações como base e expanda com criatividade, sem travar em formato.",
+        "- Você pode criar espaços, detalhes e dinâmica social quando necessário para o mundo funcionar.",
+        "- Não liste IDs/códigos no texto. Trate tudo como descrição humana e visual.",
+        "- Continuidade pode ser local ao chat; um novo prompt pode redefinir o setup.",
+        "- A pausa e o silêncio também são conteúdo.",
+        "",
+    ]
+)
+
+
+# Layout comum: título, linha em branco, seções separadas por "\n", direção criativa.
+# Cada seção termina em "\n" e a direção termina em exatamente um "\n", então o
+# resultado já sai no formato final (sem strip) com um único join.
+# Trechos fixos pré-montados no import:
+_HEAD_UNIVERSE = "MATRIX — PROMPT GERADOR (UNIVERSO)\n\n"
+_HEAD_SPACE = "MATRIX — PROMPT GERADOR (ESPAÇO)\n\n"
+_HEAD_ASSETS = "MATRIX — PROMPT GERADOR (ATIVOS)\n\n"
+_HEAD_UNIVERSE_ASSETS = "MATRIX — PROMPT GERADOR (UNIVERSO + ATIVOS)\n\n"
+_HEAD_SPACE_ASSETS = "MATRIX — PROMPT GERADOR (ESPAÇO + ATIVOS)\n\n"
+_TAIL = "\n" + _DIRECTION_BLOCK
 
 
 def generate_prompt_universe_only(u: Dict[str, Any]) -> str:
-    title = "MATRIX — PROMPT GERADOR (UNIVERSO)"
-    return (
-        "\n".join([title, "", describe_universe(u), render_direction_block()]).strip()
-        + "\n"
-    )
+    return "".join((_HEAD_UNIVERSE, describe_universe(u), _TAIL))
 
 
 def generate_prompt_space_only(
     space: Dict[str, Any], cluster: Optional[Dict[str, Any]], variation: Optional[str]
 ) -> str:
-    title = "MATRIX — PROMPT GERADOR (ESPAÇO)"
-    return (
-        "\n".join(
-            [
-                title,
-                "",
-                describe_space(space, cluster, variation),
-                render_direction_block(),
-            ]
-        ).strip()
-        + "\n"
-    )
+    return "".join((_HEAD_SPACE, describe_space(space, cluster, variation), _TAIL))
 
 
-def generate_prompt_assets_only(selected_assets: List[Dict[str, Any]]) -> str:
-    title = "MATRIX — PROMPT GERADOR (ATIVOS)"
-    return (
-        "\n".join(
-            [title, "", render_assets_block(selected_assets), render_direction_block()]
-        ).strip()
-        + "\n"
-    )
+def generate_prompt_assets_only(selected_assets: List[AssetRec]) -> str:
+    parts = [_HEAD_ASSETS]
+    emit_assets_block(selected_assets, parts)
+    parts.append(_TAIL)
+    return "".join(parts)
 
 
 def generate_prompt_universe_with_assets(
-    u: Dict[str, Any], selected_assets: List[Dict[str, Any]]
+    u: Dict[str, Any], selected_assets: List[AssetRec]
 ) -> str:
-    title = "MATRIX — PROMPT GERADOR (UNIVERSO + ATIVOS)"
-    return (
-        "\n".join(
-            [
-                title,
-                "",
-                describe_universe(u),
-                render_assets_block(selected_assets),
-                render_direction_block(),
-            ]
-        ).strip()
-        + "\n"
-    )
+    parts = [_HEAD_UNIVERSE_ASSETS, describe_universe(u), "\n"]
+    emit_assets_block(selected_assets, parts)
+    parts.append(_TAIL)
+    return "".join(parts)
 
 
 def generate_prompt_space_with_assets(
     space: Dict[str, Any],
     cluster: Optional[Dict[str, Any]],
     variation: Optional[str],
-    selected_assets: List[Dict[str, Any]],
+    selected_assets: List[AssetRec],
 ) -> str:
-    title = "MATRIX — PROMPT GERADOR (ESPAÇO + ATIVOS)"
-    return (
-        "\n".join(
-            [
-                title,
-                "",
-                describe_space(space, cluster, variation),
-                render_assets_block(selected_assets),
-                render_direction_block(),
-            ]
-        ).strip()
-        + "\n"
-    )
+    parts = [_HEAD_SPACE_ASSETS, describe_space(space, cluster, variation), "\n"]
+    emit_assets_block(selected_assets, parts)
+    parts.append(_TAIL)
+    return "".join(parts)
 
 
 # ==================================================
@@ -742,13 +824,11 @@ def generate_prompt_space_with_assets(
 
 
 def detect_mode(
-    universes: List[Dict[str, Any]],
-    spaces: List[Dict[str, Any]],
-    assets: List[Dict[str, Any]],
-    tokens: List[str],
-) -> Tuple[
-    str, Optional[Dict[str, Any]], Optional[Dict[str, Any]], List[Dict[str, Any]]
-]:
+    universe_idx: Index,
+    space_idx: Index,
+    asset_idx: AssetIndex,
+    tokens: List[Token],
+) -> Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]], List[AssetRec]]:
     """
     Retorna:
       mode: universe_only | space_only | assets_only | universe_assets | space_assets
@@ -762,23 +842,29 @@ def detect_mode(
     # tenta capturar universe/space em qualquer posição
     u = None
     s = None
-    remaining: List[str] = []
+    remaining: List[Token] = []
 
     for t in tokens:
-        if u is None:
-            u_try = resolve_universe(universes, t)
+        # prefixo do ID já diz a categoria: A- vai direto para os ativos e
+        # S- pula o universo; o resto segue a ordem universo -> espaço
+        prefix = t.key[:2]
+        if prefix == "a-":
+            remaining.append(t)
+            continue
+        if u is None and prefix != "s-":
+            u_try = resolve_universe(universe_idx, t.key)
             if u_try:
                 u = u_try
                 continue
         if s is None:
-            s_try = resolve_space(spaces, t)
+            s_try = resolve_space(space_idx, t.key)
             if s_try:
                 s = s_try
                 continue
         remaining.append(t)
 
     # resolve ativos dos remanescentes
-    selected_assets = resolve_assets(assets, remaining) if remaining else []
+    selected_assets = resolve_assets(asset_idx, remaining) if remaining else []
 
     # decisão final
     if u and not s:
@@ -802,11 +888,39 @@ def detect_mode(
 # ==================================================
 
 
+def _find_less() -> Optional[str]:
+    import shutil  # só o pager usa (import lazy: corta startup)
+
+    return shutil.which("less")
+
+
+def _needed_catalogs(tokens: List[Token]) -> Tuple[bool, bool, bool]:
+    """
+    (universos, espaços, ativos) necessários para resolver os tokens.
+    Tokens sem prefixo U-/S-/A- (nomes, B-01...) podem ser qualquer coisa.
+    """
+    prefixes = {t.key[:2] for t in tokens}
+    loose = bool(prefixes - {"u-", "s-", "a-"})
+    return (
+        loose or "u-" in prefixes,
+        loose or "s-" in prefixes,
+        loose or "a-" in prefixes,
+    )
+
+
 def main() -> None:
-    spaces_data = load_json(SPACES_FILE)
-    universes_data = load_json(UNIVERSES_FILE)
-    assets_data = load_json(ASSETS_FILE)
-    config = get_config(load_json(CONFIG_FILE)) if CONFIG_FILE.exists() else {}
+    dashboard = len(sys.argv) == 1
+    tokens = [] if dashboard else _sanitize_argv(sys.argv[1:])
+    if dashboard:
+        need_u = need_s = need_a = True
+    else:
+        need_u, need_s, need_a = _needed_catalogs(tokens)
+
+    # só os catálogos necessários; config.json não é lido porque nenhum modo
+    # o consome (CONFIG_FILE/get_config ficam para quando houver uso)
+    spaces_data = load_json(SPACES_FILE) if need_s else None
+    universes_data = load_json(UNIVERSES_FILE) if need_u else None
+    assets_data = load_json(ASSETS_FILE) if need_a else None
 
     spaces = get_spaces(spaces_data)
     clusters = get_clusters(spaces_data)
@@ -814,19 +928,26 @@ def main() -> None:
     assets = get_assets(assets_data)
 
     # sem parâmetros → dashboard
-    if len(sys.argv) == 1:
+    if dashboard:
         print_dashboard(universes, spaces, assets)
         return
 
-    tokens = _sanitize_argv(sys.argv[1:])
-    mode, u, s, selected_assets = detect_mode(universes, spaces, assets, tokens)
+    # índices de lookup, montados uma única vez por processo
+    universe_idx = _index_by(universes, "id", "name")
+    space_idx = _index_by(spaces, "id", "name")
+    cluster_idx = _index_by(clusters, "cluster_id")
+    asset_idx = index_assets([asset_record(a) for a in assets])
+
+    mode, u, s, selected_assets = detect_mode(
+        universe_idx, space_idx, asset_idx, tokens
+    )
 
     # gera prompt
     if mode == "universe_only" and u:
         prompt = generate_prompt_universe_only(u)
 
     elif mode == "space_only" and s:
-        cluster, variation = attach_cluster_if_needed(s, clusters, assets_count=0)
+        cluster, variation = attach_cluster_if_needed(s, cluster_idx, assets_count=0)
         prompt = generate_prompt_space_only(s, cluster, variation)
 
     elif mode == "assets_only":
@@ -846,7 +967,7 @@ def main() -> None:
             print("❌ Nenhum ativo válido encontrado para este espaço.")
             sys.exit(1)
         cluster, variation = attach_cluster_if_needed(
-            s, clusters, assets_count=len(selected_assets)
+            s, cluster_idx, assets_count=len(selected_assets)
         )
         prompt = generate_prompt_space_with_assets(
             s, cluster, variation, selected_assets
@@ -865,17 +986,25 @@ def main() -> None:
         sys.exit(1)
 
     # salva prompt
-    OUTPUT_FILE.write_text(prompt, encoding="utf-8")
+    data = prompt.encode("utf-8")
+    write_bytes(OUTPUT_FILE, data)
 
     # mensagem de pós-save (com path seguro para espaços)
     # out_quoted = shlex.quote(str(OUTPUT_FILE))
     # print(f"\n💾 Prompt salvo | less -R {out_quoted}\n")
     # os.system('less -R "prompt_out.txt"')
 
-    if sys.stdout.isatty() and shutil.which("less"):
-        os.system(f"less -R prompt_out.txt")
-    else:
-        os.system(f"cat prompt_out.txt")
+    # exec direto do pager (sem /bin/sh): o processo Python é substituído
+    less = _find_less() if sys.stdout.isatty() else None
+    if less:
+        sys.stdout.flush()  # avisos já impressos não podem se perder no exec
+        # caminho absoluto já resolvido: execv não varre o PATH de novo
+        os.execv(less, ["less", "-R", str(OUTPUT_FILE)])
+
+    # sem TTY (ou sem less): os mesmos bytes do arquivo, direto no stdout
+    # (sem depender de um `cat` no PATH, que não existe no Windows)
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
 
 
 if __name__ == "__main__":